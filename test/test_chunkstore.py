@@ -425,6 +425,98 @@ class SentinelHubStore3DTestWithFillValue(unittest.TestCase):
         self.assertEqual(None, cube.B12.encoding.get("_FillValue"))
 
 
+# noinspection PyTypeChecker
+class SentinelHubStoreKeysTest(unittest.TestCase):
+    def setUp(self) -> None:
+        cube_config = CubeConfig(
+            dataset_name="S2L1C",
+            band_names=["B01", "B08", "B12"],
+            bbox=(10.2, 53.5, 10.3, 53.6),
+            spatial_res=0.1 / 4000,
+            time_range=("2017-08-01", "2017-08-31"),
+            time_period="1D",
+        )
+        self.store = SentinelHubChunkStore(SentinelHubMock(cube_config), cube_config)
+
+    invalid_chunk_keys = [
+        "B01/31.0.0",
+        "B01/0.4.0",
+        "B01/0.0.4",
+        "B01/-1.0.0",
+        "B01/0.0",
+        "B01/0.0.0.0",
+        "B01/a.0.0",
+        "B01/0.0.",
+        "B01/00.0.0",
+        "B01/0.0.0/0",
+        "B02/0.0.0",
+        "0.0.0",
+    ]
+
+    def test_contains(self):
+        self.assertIn("B01/.zarray", self.store)
+        self.assertIn("B01/0.0.0", self.store)
+        self.assertIn("B01/30.3.3", self.store)
+        self.assertIn("B12/17.2.1", self.store)
+        for key in self.invalid_chunk_keys:
+            self.assertNotIn(key, self.store, msg=key)
+        self.assertNotIn(None, self.store)
+        self.assertNotIn(("B01", 0, 0, 0), self.store)
+
+    def test_non_str_keys(self):
+        for key in (None, 0, ("B01", 0, 0, 0)):
+            with self.assertRaises(KeyError, msg=repr(key)):
+                # noinspection PyStatementEffect
+                self.store[key]
+            with self.assertRaises(KeyError, msg=repr(key)):
+                self.store.getsize(key)
+
+    def test_getitem(self):
+        self.assertIsInstance(self.store["B01/.zarray"], bytes)
+        self.assertIsInstance(self.store["B01/30.3.3"], bytes)
+        for key in self.invalid_chunk_keys:
+            with self.assertRaises(KeyError, msg=key):
+                # noinspection PyStatementEffect
+                self.store[key]
+
+    def test_getsize(self):
+        self.assertEqual(
+            len(self.store["B01/.zarray"]), self.store.getsize("B01/.zarray")
+        )
+        self.assertEqual(-1, self.store.getsize("B01/0.0.0"))
+        self.assertEqual(-1, self.store.getsize("B01/30.3.3"))
+        for key in self.invalid_chunk_keys:
+            with self.assertRaises(KeyError, msg=key):
+                self.store.getsize(key)
+
+    def test_keys_and_len(self):
+        keys = list(self.store)
+        self.assertEqual(len(keys), len(set(keys)))
+        self.assertEqual(len(keys), len(self.store))
+        self.assertEqual(set(keys), set(self.store.keys()))
+        for band_name in ("B01", "B08", "B12"):
+            chunk_keys = {
+                k for k in keys if k.startswith(band_name + "/") and k[-1].isdigit()
+            }
+            self.assertEqual(31 * 4 * 4, len(chunk_keys))
+            self.assertIn(f"{band_name}/0.0.0", chunk_keys)
+            self.assertIn(f"{band_name}/30.3.3", chunk_keys)
+        for key in self.invalid_chunk_keys:
+            self.assertNotIn(key, keys)
+
+    def test_listdir(self):
+        self.assertIn("B01", self.store.listdir(""))
+        self.assertIn(".zmetadata", self.store.listdir(""))
+        keys = self.store.listdir("B01")
+        self.assertEqual(len(keys), len(set(keys)))
+        self.assertIn("B01/.zarray", keys)
+        self.assertIn("B01/.zattrs", keys)
+        self.assertIn("B01/0.0.0", keys)
+        self.assertIn("B01/30.3.3", keys)
+        self.assertEqual(2 + 31 * 4 * 4, len(keys))
+        self.assertEqual([], [k for k in keys if not k.startswith("B01/")])
+
+
 class SentinelHubStore4DTest(SentinelHubStoreTest):
     def get_cube_config(self):
         return CubeConfig(
@@ -2,6 +2,8 @@
 # Permissions are hereby granted under the terms of the MIT License:
 # https://opensource.org/licenses/MIT.
 
+import os
+import time
 import unittest
 
 import numpy as np
@@ -93,6 +95,31 @@ class CubeConfigTest(unittest.TestCase):
             np.datetime64("1970-01-01", "s"), np.datetime64(config.time_range[0], "s")
         )
 
+    @unittest.skipUnless(hasattr(time, "tzset"), "requires time.tzset()")
+    def test_time_now_in_non_utc_timezone(self):
+        old_tz = os.environ.get("TZ")
+        os.environ["TZ"] = "Europe/Berlin"
+        time.tzset()
+        try:
+            config = CubeConfig(
+                dataset_name="S2L2A",
+                band_names=("B01", "B02", "B03"),
+                bbox=(10.11, 54.17, 10.14, 54.19),
+                spatial_res=0.00001,
+                time_range=("2020-01-01", "now"),
+            )
+        finally:
+            if old_tz is None:
+                del os.environ["TZ"]
+            else:
+                os.environ["TZ"] = old_tz
+            time.tzset()
+        start_time, end_time = config.time_range
+        self.assertEqual(pd.Timestamp("2020-01-01", tz="UTC"), start_time)
+        self.assertLess(
+            abs(pd.Timestamp.now(tz="UTC") - end_time), pd.Timedelta("1min")
+        )
+
     def test_time_deltas(self):
         config = CubeConfig.from_dict(
             dict(
@@ -2,14 +2,19 @@
 # Permissions are hereby granted under the terms of the MIT License:
 # https://opensource.org/licenses/MIT.
 
+import contextlib
+import functools
 import json
 import os
 import os.path
 import pickle
 import shutil
+import tempfile
 import time
 import unittest
-from typing import Any, Sequence, Dict
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Sequence, Dict, Optional
 
 import numpy as np
 import oauthlib.oauth2
@@ -17,6 +22,7 @@ import pytest
 import zarr
 
 from xcube_sh.constants import CRS_ID_TO_URI
+from xcube_sh.constants import DEFAULT_HTTP_POOL_SIZE
 from xcube_sh.sentinelhub import DEFAULT_SH_INSTANCE_URL
 from xcube_sh.sentinelhub import SentinelHub
 from xcube_sh.sentinelhub import SentinelHubError
@@ -25,12 +31,41 @@ from xcube_sh.sentinelhub import SerializableOAuth2Session
 HAS_SH_CREDENTIALS = "SH_CLIENT_ID" in os.environ and "SH_CLIENT_SECRET" in os.environ
 REQUIRE_SH_CREDENTIALS = "requires SH credentials"
 
+# Set to keep the outputs of the get-data tests in ./test-outputs
+KEEP_RESPONSES = "XCUBE_SH_KEEP_RESPONSES" in os.environ
+
 THIS_DIR = os.path.dirname(__file__)
 REQUEST_SINGLE_JSON = os.path.join(THIS_DIR, "request-single.json")
 REQUEST_SINGLE_BYOD_JSON = os.path.join(THIS_DIR, "request-single-byod.json")
 REQUEST_MULTI_JSON = os.path.join(THIS_DIR, "request-multi.json")
 REQUEST_MULTI_BYOD_JSON = os.path.join(THIS_DIR, "request-multi-byod.json")
 
+# Binary ("application/octet-stream") responses of the SH Process API
+# are zlib-compressed, so chunks written from them must declare zlib.
+SH_RESPONSE_COMPRESSOR = {"id": "zlib", "level": 8}
+
+# Expected samples of the binary get-data responses: the first ten values
+# of the first row followed by the last ten values of the last row.
+EXPECTED_SINGLE_BINARY_SAMPLES = np.array(
+    [0.6459, 0.6647, 0.6098, 0.586, 0.5826, 0.4947, 0.6274, 0.6928, 0.6018, 0.5411]
+    + [0.8611, 0.854, 0.8645, 0.8506, 0.8252, 0.7982, 0.8227, 0.7387, 0.727, 0.7165],
+    dtype=np.float32,
+)
+
+EXPECTED_SINGLE_BYOD_BINARY_SAMPLES = np.array(
+    [61, 52, -33, -56, -100, 88, 60, 82, -61, -79]
+    + [-79, -67, -26, -69, -85, -42, -6, -14, -29, -2],
+    dtype=np.int8,
+)
+
+EXPECTED_MULTI_BINARY_SAMPLES = np.array(
+    [0.6425, 0.6676, 0.5922, 0.5822, 0.5735, 0.4921, 0.5902, 0.6518, 0.5825, 0.5321]
+    + [0.8605, 0.8528, 0.8495, 0.8378, 0.8143, 0.7959, 0.7816, 0.7407, 0.7182, 0.7326],
+    dtype=np.float32,
+)
+
+EXPECTED_DATASET_NAMES = ("DEM", "S2L1C", "S2L2A", "CUSTOM", "S1GRD")
+
 
 @unittest.skipUnless(HAS_SH_CREDENTIALS, REQUIRE_SH_CREDENTIALS)
 class SentinelHubCatalogCollectionsTest(unittest.TestCase):
@@ -155,17 +190,36 @@ class SentinelHubCatalogFeaturesTest(unittest.TestCase):
 
 @unittest.skipUnless(HAS_SH_CREDENTIALS, REQUIRE_SH_CREDENTIALS)
 class SentinelHubGetDataTest(unittest.TestCase):
-    OUTPUTS_DIR = os.path.normpath(os.path.join(THIS_DIR, "..", "test-outputs"))
-    RESPONSE_SINGLE_ZARR = os.path.join(OUTPUTS_DIR, "response-single.zarr")
-    RESPONSE_SINGLE_BYOD_ZARR = os.path.join(OUTPUTS_DIR, "response-single-byod.zarr")
-    RESPONSE_MULTI_ZARR = os.path.join(OUTPUTS_DIR, "response-multi.zarr")
-    RESPONSE_SINGLE_TIF = os.path.join(OUTPUTS_DIR, "response-single.tif")
-    RESPONSE_MULTI_TAR = os.path.join(OUTPUTS_DIR, "response-multi.tar")
+    KEPT_OUTPUTS_DIR = os.path.normpath(os.path.join(THIS_DIR, "..", "test-outputs"))
 
     @classmethod
     def setUpClass(cls) -> None:
-        cls._clear_outputs()
-        os.mkdir(cls.OUTPUTS_DIR)
+        if KEEP_RESPONSES:
+            cls.outputs_dir = cls.KEPT_OUTPUTS_DIR
+            cls._clear_outputs()
+            os.mkdir(cls.outputs_dir)
+        else:
+            cls.outputs_dir = tempfile.mkdtemp(prefix="xcube-sh-")
+        cls.sentinel_hub = SentinelHub()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.sentinel_hub.close()
+        if not KEEP_RESPONSES:
+            shutil.rmtree(cls.outputs_dir, ignore_errors=True)
+
+    def _get_data(self, request_path: str, mime_type: Optional[str] = None):
+        request = _load_json(request_path)
+        t1 = time.perf_counter()
+        response = self.sentinel_hub.get_data(request, mime_type=mime_type, stream=True)
+        if response is not None:
+            self.addCleanup(response.close)
+        t2 = time.perf_counter()
+        print(
+            f"get_data({os.path.basename(request_path)!r}, {mime_type!r}):"
+            f" took {t2 - t1} secs"
+        )
+        return response
 
     @classmethod
     def _clear_outputs(cls) -> None:
@@ -173,207 +227,114 @@ class SentinelHubGetDataTest(unittest.TestCase):
         def handle_error(func, path, exc_info):
             print(f"error: failed to rmtree {path}")
 
-        shutil.rmtree(cls.OUTPUTS_DIR, ignore_errors=True, onerror=handle_error)
-
-    def test_get_data_single_binary(self):
-        with open(REQUEST_SINGLE_JSON, "r") as fp:
-            request = json.load(fp)
+        shutil.rmtree(cls.outputs_dir, ignore_errors=True, onerror=handle_error)
 
-        sentinel_hub = SentinelHub()
+    @classmethod
+    def _output_path(cls, name: str) -> str:
+        return os.path.join(cls.outputs_dir, name)
 
-        t1 = time.perf_counter()
-        response = sentinel_hub.get_data(request, mime_type="application/octet-stream")
-        t2 = time.perf_counter()
-        print(f"test_get_data_single_binary: took {t2 - t1} secs")
+    def test_get_data_single_binary(self):
+        response = self._get_data(
+            REQUEST_SINGLE_JSON, mime_type="application/octet-stream"
+        )
 
         self.assertEqual("FLOAT32", response.headers.get("sh-sampletype"))
         self.assertEqual("512", response.headers.get("sh-width"))
         self.assertEqual("512", response.headers.get("sh-height"))
 
-        _write_zarr_array(
-            self.RESPONSE_SINGLE_ZARR, response.content, 0, (512, 512, 1), "<f4"
-        )
-
-        sentinel_hub.close()
+        if KEEP_RESPONSES:
+            _write_zarr_array(
+                self._output_path("response-single.zarr"),
+                response.content,
+                0,
+                (512, 512, 1),
+                "<f4",
+            )
 
-        zarr_array = zarr.open_array(self.RESPONSE_SINGLE_ZARR)
-        self.assertEqual((1, 512, 512, 1), zarr_array.shape)
-        self.assertEqual((1, 512, 512, 1), zarr_array.chunks)
-        np_array = np.array(zarr_array).astype(np.float32)
+        # The response is a single zlib-compressed chunk,
+        # see SH_RESPONSE_COMPRESSOR
+        np_array = np.frombuffer(zlib.decompress(response.content), dtype="<f4")
         self.assertEqual(np.float32, np_array.dtype)
-        np.testing.assert_almost_equal(
-            np.array(
-                [
-                    0.6459,
-                    0.6647,
-                    0.6098,
-                    0.586,
-                    0.5826,
-                    0.4947,
-                    0.6274,
-                    0.6928,
-                    0.6018,
-                    0.5411,
-                ],
-                dtype=np.float32,
-            ),
-            np_array[0, 0, 0:10, 0],
-        )
-        np.testing.assert_almost_equal(
-            np.array(
-                [
-                    0.8611,
-                    0.854,
-                    0.8645,
-                    0.8506,
-                    0.8252,
-                    0.7982,
-                    0.8227,
-                    0.7387,
-                    0.727,
-                    0.7165,
-                ],
-                dtype=np.float32,
-            ),
-            np_array[0, 511, -10:, 0],
+        self.assertEqual(512 * 512, np_array.size)
+        np_array = np_array.reshape((1, 512, 512, 1))
+        np.testing.assert_allclose(
+            np.concatenate([np_array[0, 0, 0:10, 0], np_array[0, 511, -10:, 0]]),
+            EXPECTED_SINGLE_BINARY_SAMPLES,
+            rtol=0,
+            atol=1.5e-7,
         )
 
     # As of 2022-12-06 this tests produces HTTP code 500 (server error)
 
     @unittest.skip("As of 2022-12-06 this tests produces HTTP code 500 (server error)")
     def test_get_data_single_binary_byod(self):
-        with open(REQUEST_SINGLE_BYOD_JSON, "r") as fp:
-            request = json.load(fp)
-
-        sentinel_hub = SentinelHub()
-
-        t1 = time.perf_counter()
-        response = sentinel_hub.get_data(request, mime_type="application/octet-stream")
-        t2 = time.perf_counter()
-        print(f"test_get_data_single_binary_byod: took {t2 - t1} secs")
+        response = self._get_data(
+            REQUEST_SINGLE_BYOD_JSON, mime_type="application/octet-stream"
+        )
 
         self.assertEqual("UINT8", response.headers.get("sh-sampletype"))
         self.assertEqual("512", response.headers.get("sh-width"))
         self.assertEqual("305", response.headers.get("sh-height"))
 
-        _write_zarr_array(
-            self.RESPONSE_SINGLE_BYOD_ZARR, response.content, 0, (512, 305, 1), "i1"
-        )
+        zarr_path = self._output_path("response-single-byod.zarr")
+        _write_zarr_array(zarr_path, response.content, 0, (512, 305, 1), "i1")
 
-        sentinel_hub.close()
-
-        zarr_array = zarr.open_array(self.RESPONSE_SINGLE_BYOD_ZARR)
+        zarr_array = zarr.open_array(zarr_path)
         self.assertEqual((1, 512, 305, 1), zarr_array.shape)
         self.assertEqual((1, 512, 305, 1), zarr_array.chunks)
-        np_array = np.array(zarr_array).astype(np.int8)
+        np_array = zarr_array[:]
         self.assertEqual(np.int8, np_array.dtype)
-        np.testing.assert_almost_equal(
-            np.array([61, 52, -33, -56, -100, 88, 60, 82, -61, -79], dtype=np.int8),
-            np_array[0, 0, 0:10, 0],
-        )
-        np.testing.assert_almost_equal(
-            np.array([-79, -67, -26, -69, -85, -42, -6, -14, -29, -2], dtype=np.int8),
-            np_array[0, 511, -10:, 0],
+        np.testing.assert_array_equal(
+            np.concatenate([np_array[0, 0, 0:10, 0], np_array[0, 511, -10:, 0]]),
+            EXPECTED_SINGLE_BYOD_BINARY_SAMPLES,
         )
 
     @unittest.skip("Known to fail, see TODO in code")
     def test_get_data_multi_binary(self):
-        with open(REQUEST_MULTI_JSON, "r") as fp:
-            request = json.load(fp)
-
-        sentinel_hub = SentinelHub()
-
         # TODO (forman): discuss with Primoz how
         #  to effectively do multi-bands request
-        t1 = time.perf_counter()
-        response = sentinel_hub.get_data(request, mime_type="application/octet-stream")
-        t2 = time.perf_counter()
-        print(f"test_get_data_multi_binary: took {t2 - t1} secs")
-
-        _write_zarr_array(
-            self.RESPONSE_MULTI_ZARR, response.content, 0, (512, 512, 4), "<f4"
+        response = self._get_data(
+            REQUEST_MULTI_JSON, mime_type="application/octet-stream"
         )
 
-        sentinel_hub.close()
+        zarr_path = self._output_path("response-multi.zarr")
+        _write_zarr_array(zarr_path, response.content, 0, (512, 512, 4), "<f4")
 
-        zarr_array = zarr.open_array(self.RESPONSE_MULTI_ZARR)
+        zarr_array = zarr.open_array(zarr_path)
         self.assertEqual((1, 512, 512, 4), zarr_array.shape)
         self.assertEqual((1, 512, 512, 4), zarr_array.chunks)
-        np_array = np.array(zarr_array).astype(np.float32)
+        np_array = zarr_array[:]
         self.assertEqual(np.float32, np_array.dtype)
-        np.testing.assert_almost_equal(
-            np.array(
-                [
-                    0.6425,
-                    0.6676,
-                    0.5922,
-                    0.5822,
-                    0.5735,
-                    0.4921,
-                    0.5902,
-                    0.6518,
-                    0.5825,
-                    0.5321,
-                ],
-                dtype=np.float32,
-            ),
-            np_array[0, 0, 0:10, 0],
-        )
-        np.testing.assert_almost_equal(
-            np.array(
-                [
-                    0.8605,
-                    0.8528,
-                    0.8495,
-                    0.8378,
-                    0.8143,
-                    0.7959,
-                    0.7816,
-                    0.7407,
-                    0.7182,
-                    0.7326,
-                ],
-                dtype=np.float32,
-            ),
-            np_array[0, 511, -10:, 0],
+        np.testing.assert_allclose(
+            np.concatenate([np_array[0, 0, 0:10, 0], np_array[0, 511, -10:, 0]]),
+            EXPECTED_MULTI_BINARY_SAMPLES,
+            rtol=0,
+            atol=1.5e-7,
         )
 
     def test_get_data_single(self):
-        with open(REQUEST_SINGLE_JSON, "r") as fp:
-            request = json.load(fp)
-
-        sentinel_hub = SentinelHub()
+        response = self._get_data(REQUEST_SINGLE_JSON)
 
-        t1 = time.perf_counter()
-        response = sentinel_hub.get_data(request)
-        t2 = time.perf_counter()
-        print(f"test_get_data_single: took {t2 - t1} secs")
-
-        with open(self.RESPONSE_SINGLE_TIF, "wb") as fp:
-            fp.write(response.content)
-
-        sentinel_hub.close()
+        self.assertTrue(response.ok)
+        num_bytes = _consume_response(
+            response,
+            self._output_path("response-single.tif") if KEEP_RESPONSES else None,
+        )
+        self.assertGreater(num_bytes, 0)
 
     def test_get_data_multi(self):
-        with open(REQUEST_MULTI_JSON, "r") as fp:
-            request = json.load(fp)
-
-        sentinel_hub = SentinelHub()
-
-        t1 = time.perf_counter()
-        response = sentinel_hub.get_data(request)
-        t2 = time.perf_counter()
-        print(f"test_get_data_multi: took {t2 - t1} secs")
-
-        with open(self.RESPONSE_MULTI_TAR, "wb") as fp:
-            fp.write(response.content)
+        response = self._get_data(REQUEST_MULTI_JSON)
 
-        sentinel_hub.close()
+        self.assertTrue(response.ok)
+        num_bytes = _consume_response(
+            response,
+            self._output_path("response-multi.tar") if KEEP_RESPONSES else None,
+        )
+        self.assertGreater(num_bytes, 0)
 
 
 class SentinelHubCatalogueTest(unittest.TestCase):
     def test_dataset_names(self):
-        expected_dataset_names = ["DEM", "S2L1C", "S2L2A", "CUSTOM", "S1GRD"]
         sentinel_hub = SentinelHub(
             session=SessionMock(
                 {
@@ -389,7 +350,7 @@ class SentinelHubCatalogueTest(unittest.TestCase):
                 }
             )
         )
-        self.assertEqual(expected_dataset_names, sentinel_hub.dataset_names)
+        self.assertEqual(list(EXPECTED_DATASET_NAMES), sentinel_hub.dataset_names)
 
     def test_get_features(self):
         properties = [
@@ -437,13 +398,10 @@ class SentinelHubTokenInfoTest(unittest.TestCase):
                 }
             )
         )
+        token_info = sentinel_hub.token_info
         self.assertEqual(
             expected_token_info,
-            {
-                k: v
-                for k, v in sentinel_hub.token_info.items()
-                if k in ["name", "email", "active"]
-            },
+            {k: token_info.get(k) for k in expected_token_info},
         )
         sentinel_hub.close()
 
@@ -463,9 +421,17 @@ class SentinelHubAuthTest(unittest.TestCase):
             session=session, client_id="john", client_secret="doe", num_retries=2
         )
         self.assertFalse(session.token_refreshed)
-        response = sentinel_hub.get_data(request, mime_type="application/octet-stream")
+        response = sentinel_hub.get_data(
+            request, mime_type="application/octet-stream", stream=True
+        )
         self.assertFalse(response.ok)
         self.assertTrue(session.token_refreshed)
+        self.assertEqual([True, True], [kw["stream"] for kw in session.post_kwargs])
+        # Retried responses are closed, the returned one is left open
+        self.assertEqual(2, len(session.responses))
+        self.assertTrue(session.responses[0].closed)
+        self.assertIs(response, session.responses[-1])
+        self.assertFalse(response.closed)
         sentinel_hub.close()
 
     def test_token_can_be_refreshed(self):
@@ -485,10 +451,25 @@ class SentinelHubAuthTest(unittest.TestCase):
         response = sentinel_hub.get_data(request, mime_type="application/octet-stream")
         self.assertTrue(response.ok)
         self.assertTrue(session.token_refreshed)
+        # stream defaults to False and is passed to every post() attempt
+        self.assertEqual([False, False], [kw["stream"] for kw in session.post_kwargs])
         sentinel_hub.close()
 
 
 class SentinelHubNewRequestTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        request_paths = (
+            REQUEST_SINGLE_JSON,
+            REQUEST_MULTI_JSON,
+            REQUEST_SINGLE_BYOD_JSON,
+            REQUEST_MULTI_BYOD_JSON,
+        )
+        with ThreadPoolExecutor(max_workers=len(request_paths)) as executor:
+            cls.expected_requests = dict(
+                zip(request_paths, executor.map(_load_json, request_paths))
+            )
+
     def test_new_data_request_single(self):
         request = SentinelHub.new_data_request(
             "S2L1C",
@@ -508,8 +489,7 @@ class SentinelHubNewRequestTest(unittest.TestCase):
         # with open(os.path.join(REQUEST_SINGLE_JSON, 'w') as fp:
         #    json.dump(request, fp, indent=2)
 
-        with open(REQUEST_SINGLE_JSON, "r") as fp:
-            expected_request = json.load(fp)
+        expected_request = self.expected_requests[REQUEST_SINGLE_JSON]
 
         self.assertEqual(expected_request, request)
 
@@ -532,8 +512,7 @@ class SentinelHubNewRequestTest(unittest.TestCase):
         # with open(REQUEST_MULTI_JSON), 'w') as fp:
         #    json.dump(request, fp, indent=2)
 
-        with open(REQUEST_MULTI_JSON, "r") as fp:
-            expected_request = json.load(fp)
+        expected_request = self.expected_requests[REQUEST_MULTI_JSON]
 
         self.assertEqual(expected_request, request)
 
@@ -551,8 +530,7 @@ class SentinelHubNewRequestTest(unittest.TestCase):
         # with open(os.path.join(REQUEST_SINGLE_JSON, 'w') as fp:
         #    json.dump(request, fp, indent=2)
 
-        with open(REQUEST_SINGLE_BYOD_JSON, "r") as fp:
-            expected_request = json.load(fp)
+        expected_request = self.expected_requests[REQUEST_SINGLE_BYOD_JSON]
 
         self.assertEqual(expected_request, request)
 
@@ -570,8 +548,7 @@ class SentinelHubNewRequestTest(unittest.TestCase):
         # with open(REQUEST_MULTI_JSON), 'w') as fp:
         #    json.dump(request, fp, indent=2)
 
-        with open(REQUEST_MULTI_BYOD_JSON, "r") as fp:
-            expected_request = json.load(fp)
+        expected_request = self.expected_requests[REQUEST_MULTI_BYOD_JSON]
 
         self.assertEqual(expected_request, request)
 
@@ -594,9 +571,9 @@ class SerializableOAuth2SessionTest(unittest.TestCase):
         self.assertIsNotNone(session._client)
         self.assertIsNotNone(session.adapters)
 
-        actual = pickle.loads(pickle.dumps(session))
+        actual = pickle.loads(pickle.dumps(session, protocol=pickle.HIGHEST_PROTOCOL))
 
-        valid_test_attrs = SerializableOAuth2Session._SERIALIZED_ATTRS
+        valid_test_attrs = list(SerializableOAuth2Session._SERIALIZED_ATTRS)
         valid_test_attrs.remove("_client")
         valid_test_attrs.remove("adapters")
 
@@ -608,6 +585,27 @@ class SerializableOAuth2SessionTest(unittest.TestCase):
 
         self.assertEqual(expected, actual)
 
+    def test_pool_size(self):
+        from oauthlib.oauth2 import BackendApplicationClient
+
+        client = BackendApplicationClient(client_id="sdfvdsv")
+        session = SerializableOAuth2Session(client=client)
+        self.assert_pool_size(session)
+
+        # __setstate__ rebuilds the session, including its adapters
+        actual = pickle.loads(pickle.dumps(session, protocol=pickle.HIGHEST_PROTOCOL))
+        self.assert_pool_size(actual)
+
+    def assert_pool_size(self, session: SerializableOAuth2Session):
+        for url in ("https://services.sentinel-hub.com", "http://localhost"):
+            adapter = session.get_adapter(url)
+            self.assertEqual(DEFAULT_HTTP_POOL_SIZE, adapter._pool_connections)
+            self.assertEqual(DEFAULT_HTTP_POOL_SIZE, adapter._pool_maxsize)
+            self.assertEqual(
+                DEFAULT_HTTP_POOL_SIZE,
+                adapter.poolmanager.connection_pool_kw["maxsize"],
+            )
+
 
 def _write_zarr_array(
     dir_path: str,
@@ -623,30 +621,79 @@ def _write_zarr_array(
     data_file_name = f"{time_index}.0.0.0"
     if not os.path.isdir(dir_path):
         os.mkdir(dir_path)
-    with open(os.path.join(dir_path, data_file_name), "wb") as fp:
-        fp.write(data)
-    with open(os.path.join(dir_path, ".zattrs"), "w") as fp:
-        json.dump(dict(_ARRAY_DIMENSIONS=dims, **(attrs or {})), fp)
-    with open(os.path.join(dir_path, ".zarray"), "w") as fp:
-        json.dump(
-            {
-                "zarr_format": 2,
-                "chunks": list(shape),
-                "shape": list(shape),
-                "compressor": {"id": "zlib", "level": 8},
-                "dtype": data_type,
-                "fill_value": None,
-                "filters": None,
-                "order": "C",
-            },
-            fp,
-        )
+    _write_bytes(os.path.join(dir_path, data_file_name), data)
+    _write_json(
+        os.path.join(dir_path, ".zattrs"),
+        dict(_ARRAY_DIMENSIONS=dims, **(attrs or {})),
+    )
+    _write_json(
+        os.path.join(dir_path, ".zarray"),
+        {
+            "zarr_format": 2,
+            "chunks": list(shape),
+            "shape": list(shape),
+            "compressor": SH_RESPONSE_COMPRESSOR,
+            "dtype": data_type,
+            "fill_value": None,
+            "filters": None,
+            "order": "C",
+        },
+    )
+
+
+def _consume_response(response: Any, file_path: Optional[str] = None) -> int:
+    """Stream the body of *response*, optionally into *file_path*.
+    Return the number of bytes received."""
+    num_bytes = 0
+    with open(file_path, "wb") if file_path else contextlib.nullcontext() as fp:
+        for chunk in response.iter_content(chunk_size=1 << 20):
+            if fp is not None:
+                fp.write(chunk)
+            num_bytes += len(chunk)
+    return num_bytes
+
+
+@functools.lru_cache(maxsize=None)
+def _load_json(file_path: str) -> Dict:
+    with open(file_path, "r") as fp:
+        return json.load(fp)
+
+
+def _write_bytes(file_path: str, data: Any):
+    # Unbuffered write, saves the copy into the BufferedWriter
+    fd = os.open(
+        file_path,
+        os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0),
+        0o644,
+    )
+    try:
+        view = memoryview(data).cast("B")
+        if view and hasattr(os, "posix_fallocate"):
+            # Reserve the file extent up front, not available on Windows/macOS
+            try:
+                os.posix_fallocate(fd, 0, view.nbytes)
+            except OSError:
+                pass
+        while view:
+            view = view[os.write(fd, view) :]
+    finally:
+        os.close(fd)
+
+
+def _write_json(file_path: str, obj: Dict):
+    with open(file_path, "wb") as fp:
+        fp.write(json.dumps(obj).encode("utf-8"))
 
 
 class SessionMock:
     def __init__(self, mapping: Dict):
         self.mapping = mapping
         self.token_refreshed = False
+        # Encoded response bodies, keyed by (method, url)
+        self._contents = {}
+        self.responses = []
+        # Keyword arguments of each post() call
+        self.post_kwargs = []
 
     # noinspection PyUnusedLocal
     def fetch_token(self, token_url: str, client_id: str, client_secret: str):
@@ -656,14 +703,21 @@ class SessionMock:
     def get(self, url, **kwargs):
         return self._invoke(url, "get")
 
-    # noinspection PyUnusedLocal
     def post(self, url, **kwargs):
+        self.post_kwargs.append(kwargs)
         return self._invoke(url, "post")
 
     def _invoke(self, url: str, method: str):
         self._maybe_raise_token_expired_error(method)
         status_code = self.mapping[method].get("status_code", 200)
-        return self._response(self.mapping[method][url], status_code)
+        key = method, url
+        content = self._contents.get(key)
+        if content is None:
+            content = self._encode(self.mapping[method][url])
+            self._contents[key] = content
+        response = SessionResponseMock(content, status_code=status_code)
+        self.responses.append(response)
+        return response
 
     def close(self):
         pass
@@ -673,27 +727,29 @@ class SessionMock:
             raise oauthlib.oauth2.TokenExpiredError()
 
     @classmethod
-    def _response(cls, content_obj, status_code):
-        return SessionResponseMock(content_obj, status_code=status_code)
+    def _encode(cls, content_obj) -> bytes:
+        if isinstance(content_obj, bytes):
+            return content_obj
+        return json.dumps(content_obj).encode("utf-8")
 
 
 class SessionResponseMock:
-    def __init__(self, content_obj, status_code=200):
-        self.content_obj = content_obj
+    def __init__(self, content: bytes, status_code=200):
+        self.content = content
         self.status_code = status_code
         self.reason = "<reason not used>"
         self.headers = dict()
+        self.closed = False
 
     @property
     def ok(self) -> bool:
         return 200 <= self.status_code < 400
 
-    @property
-    def content(self):
-        return json.dumps(self.content_obj)
-
     def json(self):
-        return self.content_obj
+        return json.loads(self.content)
 
     def raise_for_status(self):
         pass
+
+    def close(self):
+        self.closed = True
@@ -9,6 +9,7 @@ import time
 from abc import abstractmethod, ABCMeta
 from collections.abc import MutableMapping
 from typing import Iterator, Any, List, Dict, Tuple, Callable, Iterable, KeysView
+from typing import Optional
 
 import numpy as np
 import pandas as pd
@@ -31,21 +32,14 @@ _STATIC_ARRAY_COMPRESSOR = Blosc(**_STATIC_ARRAY_COMPRESSOR_PARAMS)
 
 
 def _dict_to_bytes(d: Dict) -> bytes:
-    return _str_to_bytes(json.dumps(d, indent=2))
-
-
-def _bytes_to_dict(b: bytes) -> Dict:
-    return json.loads(_bytes_to_str(b))
+    # Compact JSON, the metadata is only read by Zarr
+    return _str_to_bytes(json.dumps(d, separators=(",", ":")))
 
 
 def _str_to_bytes(s: str):
     return bytes(s, encoding="utf-8")
 
 
-def _bytes_to_str(b: bytes) -> str:
-    return b.decode("utf-8")
-
-
 class RemoteStore(MutableMapping, metaclass=ABCMeta):
     """
     A remote Zarr Store.
@@ -74,42 +68,29 @@ class RemoteStore(MutableMapping, metaclass=ABCMeta):
         width, height = self._cube_config.size
         spatial_res = self._cube_config.spatial_res
         x1, y1, x2, y2 = self._cube_config.bbox
-        x_array = np.linspace(
-            x1 + spatial_res / 2, x2 - spatial_res / 2, width, dtype=np.float64
-        )
-        y_array = np.linspace(
-            y2 - spatial_res / 2, y1 + spatial_res / 2, height, dtype=np.float64
-        )
+        # Pixel centers; CubeConfig ensures that x2 = x1 + width * spatial_res
+        # and y2 = y1 + height * spatial_res
+        x_array = x1 + spatial_res * (0.5 + np.arange(width, dtype=np.float64))
+        y_array = y2 - spatial_res * (0.5 + np.arange(height, dtype=np.float64))
 
         crs = pyproj.CRS.from_string(cube_config.crs)
 
-        def time_stamp_to_str(ts: pd.Timestamp) -> str:
+        def to_epoch_seconds(time_stamps: pd.DatetimeIndex) -> np.ndarray:
             """
-            Convert to ISO string and strip timezone.
-            Used to create numpy datetime64 arrays.
-            We cannot create directly from pd.Timestamp because Numpy doesn't
-            like parsing timezones anymore.
+            Convert to seconds since epoch, ignoring the timezone.
+            We do not convert to UTC, because the local time of
+            the given time stamps is used.
             """
-            ts_str: str = ts.isoformat()
-            if ts_str[-1] == "Z":
-                return ts_str[0:-1]
-            try:
-                i = ts_str.rindex("+")
-                return ts_str[0:i]
-            except ValueError:
-                return ts_str
-
-        t_array = np.array(
-            [time_stamp_to_str(s + 0.5 * (e - s)) for s, e in self._time_ranges],
-            dtype="datetime64[s]",
-        ).astype(np.int64)
-        t_bnds_array = np.array(
-            [
-                [time_stamp_to_str(s), time_stamp_to_str(e)]
-                for s, e in self._time_ranges
-            ],
-            dtype="datetime64[s]",
-        ).astype(np.int64)
+            if time_stamps.tz is not None:
+                time_stamps = time_stamps.tz_localize(None)
+            return time_stamps.values.astype("datetime64[s]").astype(np.int64)
+
+        t_starts = pd.DatetimeIndex([s for s, _ in self._time_ranges])
+        t_ends = pd.DatetimeIndex([e for _, e in self._time_ranges])
+        t_array = to_epoch_seconds(t_starts + 0.5 * (t_ends - t_starts))
+        t_bnds_array = np.stack(
+            [to_epoch_seconds(t_starts), to_epoch_seconds(t_ends)], axis=1
+        )
 
         time_coverage_start = self._time_ranges[0][0]
         time_coverage_end = self._time_ranges[-1][1]
@@ -151,10 +132,14 @@ class RemoteStore(MutableMapping, metaclass=ABCMeta):
             global_attrs.update(processing_level=processing_level)
 
         # setup Virtual File System (vfs)
-        self._vfs = {
-            ".zgroup": _dict_to_bytes(dict(zarr_format=2)),
-            ".zattrs": _dict_to_bytes(global_attrs),
-        }
+        self._vfs = {}
+        # Metadata objects of the vfs, kept for _consolidate_metadata()
+        self._metadata = {}
+        # Number of chunks per dimension of the remote arrays.
+        # Their chunk keys are not stored in the vfs, see _chunk_index().
+        self._remote_arrays: Dict[str, Tuple[int, ...]] = {}
+        self._add_metadata(".zgroup", dict(zarr_format=2))
+        self._add_metadata(".zattrs", global_attrs)
 
         if crs.is_geographic:
             x_name, y_name = "lon", "lat"
@@ -266,13 +251,8 @@ class RemoteStore(MutableMapping, metaclass=ABCMeta):
     def get_time_ranges(self) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
         time_start, time_end = self._cube_config.time_range
         time_period = self._cube_config.time_period
-        time_ranges = []
-        time_now = time_start
-        while time_now <= time_end:
-            time_next = time_now + time_period
-            time_ranges.append((time_now, time_next))
-            time_now = time_next
-        return time_ranges
+        time_starts = pd.date_range(time_start, time_end, freq=time_period)
+        return list(zip(time_starts, time_starts + time_period))
 
     def add_observer(self, observer: Callable):
         """
@@ -341,10 +321,11 @@ class RemoteStore(MutableMapping, metaclass=ABCMeta):
         }
         chunk_key = ".".join(["0"] * array.ndim)
         self._vfs[name] = _str_to_bytes("")
-        self._vfs[name + "/.zarray"] = _dict_to_bytes(array_metadata)
-        self._vfs[name + "/.zattrs"] = _dict_to_bytes(attrs)
+        self._add_metadata(name + "/.zarray", array_metadata)
+        self._add_metadata(name + "/.zattrs", attrs)
+        # Blosc reads from the buffer, no need for a tobytes() copy
         self._vfs[name + "/" + chunk_key] = _STATIC_ARRAY_COMPRESSOR.encode(
-            array.tobytes(order=order)
+            np.ascontiguousarray(array)
         )
 
     def _add_remote_array(
@@ -366,14 +347,10 @@ class RemoteStore(MutableMapping, metaclass=ABCMeta):
         )
         array_metadata.update(encoding)
         self._vfs[name] = _str_to_bytes("")
-        self._vfs[name + "/.zarray"] = _dict_to_bytes(array_metadata)
-        self._vfs[name + "/.zattrs"] = _dict_to_bytes(attrs)
+        self._add_metadata(name + "/.zarray", array_metadata)
+        self._add_metadata(name + "/.zattrs", attrs)
         nums = np.array(shape) // np.array(chunks)
-        indexes = itertools.product(*tuple(map(range, map(int, nums))))
-        for index in indexes:
-            filename = ".".join(map(str, index))
-            # noinspection PyTypeChecker
-            self._vfs[name + "/" + filename] = name, index
+        self._remote_arrays[name] = tuple(map(int, nums))
 
     @property
     def cube_config(self) -> CubeConfig:
@@ -441,6 +418,10 @@ class RemoteStore(MutableMapping, metaclass=ABCMeta):
         """
         pass
 
+    def _add_metadata(self, key: str, metadata: Dict):
+        self._vfs[key] = _dict_to_bytes(metadata)
+        self._metadata[key] = metadata
+
     def _consolidate_metadata(self):
         # Consolidate metadata to suppress warning:  (#69)
         #
@@ -448,21 +429,44 @@ class RemoteStore(MutableMapping, metaclass=ABCMeta):
         # metadata, falling back to try reading non-consolidated
         # metadata. ...
         #
-        metadata = dict()
-        for k, v in self._vfs.items():
-            if (
-                k == ".zattrs"
-                or k.endswith("/.zattrs")
-                or k == ".zarray"
-                or k.endswith("/.zarray")
-                or k == ".zgroup"
-                or k.endswith("/.zgroup")
-            ):
-                metadata[k] = _bytes_to_dict(v)
+        # The metadata objects have been recorded by _add_metadata(),
+        # so there is no need to parse them again from the vfs.
         self._vfs[".zmetadata"] = _dict_to_bytes(
-            dict(zarr_consolidated_format=1, metadata=metadata)
+            dict(zarr_consolidated_format=1, metadata=self._metadata)
         )
 
+    def _chunk_index(self, key: str) -> Optional[Tuple[str, Tuple[int, ...]]]:
+        """
+        Get the array name and the chunk index of a remote chunk
+        from given *key*, or None if *key* is not a remote chunk key.
+        """
+        name, _, filename = key.rpartition("/")
+        nums = self._remote_arrays.get(name)
+        if nums is None:
+            return None
+        parts = filename.split(".")
+        if len(parts) != len(nums):
+            return None
+        try:
+            index = tuple(map(int, parts))
+        except ValueError:
+            return None
+        if filename != ".".join(map(str, index)):
+            return None
+        if not all(0 <= i < n for i, n in zip(index, nums)):
+            return None
+        return name, index
+
+    def _chunk_keys(self, name: str) -> Iterator[str]:
+        prefix = name + "/"
+        for index in itertools.product(*map(range, self._remote_arrays[name])):
+            yield prefix + ".".join(map(str, index))
+
+    def _iter_keys(self) -> Iterator[str]:
+        yield from self._vfs.keys()
+        for name in self._remote_arrays:
+            yield from self._chunk_keys(name)
+
     @property
     def _class_name(self):
         return self.__module__ + "." + self.__class__.__name__
@@ -474,7 +478,7 @@ class RemoteStore(MutableMapping, metaclass=ABCMeta):
     def keys(self) -> KeysView[str]:
         if self._trace_store_calls:
             print(f"{self._class_name}.keys()")
-        return self._vfs.keys()
+        return super().keys()
 
     def listdir(self, key: str) -> Iterable[str]:
         if self._trace_store_calls:
@@ -484,41 +488,58 @@ class RemoteStore(MutableMapping, metaclass=ABCMeta):
         else:
             prefix = key + "/"
             start = len(prefix)
-            return list(
-                (
-                    k
-                    for k in self._vfs.keys()
-                    if k.startswith(prefix) and k.find("/", start) == -1
-                )
-            )
+            keys = [
+                k
+                for k in self._vfs.keys()
+                if k.startswith(prefix) and k.find("/", start) == -1
+            ]
+            if key in self._remote_arrays:
+                keys.extend(self._chunk_keys(key))
+            return keys
 
     def getsize(self, key: str) -> int:
         if self._trace_store_calls:
             print(f"{self._class_name}.getsize(key={key!r})")
+        if (
+            key not in self._vfs
+            and isinstance(key, str)
+            and self._chunk_index(key) is not None
+        ):
+            # Size of remote chunks is unknown before they are fetched
+            return -1
         return len(self._vfs[key])
 
     def __iter__(self) -> Iterator[str]:
         if self._trace_store_calls:
             print(f"{self._class_name}.__iter__()")
-        return iter(self._vfs.keys())
+        return self._iter_keys()
 
     def __len__(self) -> int:
         if self._trace_store_calls:
             print(f"{self._class_name}.__len__()")
-        return len(self._vfs.keys())
+        return len(self._vfs) + sum(
+            math.prod(nums) for nums in self._remote_arrays.values()
+        )
 
     def __contains__(self, key) -> bool:
         if self._trace_store_calls:
             print(f"{self._class_name}.__contains__(key={key!r})")
-        return key in self._vfs
+        return key in self._vfs or (
+            isinstance(key, str) and self._chunk_index(key) is not None
+        )
 
     def __getitem__(self, key: str) -> bytes:
         if self._trace_store_calls:
             print(f"{self._class_name}.__getitem__(key={key!r})")
-        value = self._vfs[key]
-        if isinstance(value, tuple):
-            return self._fetch_chunk(key, *value)
-        return value
+        value = self._vfs.get(key)
+        if value is not None:
+            return value
+        if not isinstance(key, str):
+            raise KeyError(key)
+        chunk_index = self._chunk_index(key)
+        if chunk_index is None:
+            raise KeyError(key)
+        return self._fetch_chunk(key, *chunk_index)
 
     def __setitem__(self, key: str, value: bytes) -> None:
         if self._trace_store_calls:
@@ -581,6 +602,11 @@ class SentinelHubChunkStore(RemoteStore):
         super().__init__(
             cube_config, observer=observer, trace_store_calls=trace_store_calls
         )
+        # Data request arguments that are the same for all chunks of a band
+        self._request_kwargs = {
+            band_name: self._get_request_kwargs(band_name)
+            for band_name in self._remote_arrays
+        }
 
     def get_time_ranges(self) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
         time_start, time_end = self._cube_config.time_range
@@ -683,6 +709,8 @@ class SentinelHubChunkStore(RemoteStore):
         return dict(
             dtype=dtype,
             fill_value=fill_value,
+            # Chunks are the Process API's binary responses, passed through
+            # as they are. These are zlib streams, so the codec must match.
             compressor=dict(id="zlib", level=8),
             order="C",
         )
@@ -706,6 +734,27 @@ class SentinelHubChunkStore(RemoteStore):
         start_time, end_time = time_range
         time_range = start_time.isoformat(), end_time.isoformat()
 
+        request = SentinelHub.new_data_request(
+            time_range=time_range, bbox=bbox, **self._request_kwargs[band_name]
+        )
+
+        response = self._sentinel_hub.get_data(
+            request, mime_type="application/octet-stream"
+        )
+
+        if response is None or not response.ok:
+            message = (
+                f"{key}: cannot fetch chunk for variable"
+                f" {band_name!r}, bbox {bbox!r}, and"
+                f" time_range {time_range!r}"
+            )
+            if response is not None:
+                message += f": {SentinelHubError(response)}"
+            raise KeyError(message)
+
+        return response.content
+
+    def _get_request_kwargs(self, band_name: str) -> Dict[str, Any]:
         if band_name == "band_data":
             band_names = self.cube_config.band_names
         else:
@@ -728,12 +777,10 @@ class SentinelHubChunkStore(RemoteStore):
             index = self.cube_config.band_names.index(band_name)
             band_sample_types = band_sample_types[index]
 
-        request = SentinelHub.new_data_request(
-            self.cube_config.dataset_name,
-            band_names,
-            self.cube_config.tile_size,
-            time_range=time_range,
-            bbox=bbox,
+        return dict(
+            dataset_name=self.cube_config.dataset_name,
+            band_names=band_names,
+            size=self.cube_config.tile_size,
             band_sample_types=band_sample_types,
             crs=CRS_ID_TO_URI[self.cube_config.crs],
             upsampling=self.cube_config.upsampling,
@@ -743,19 +790,3 @@ class SentinelHubChunkStore(RemoteStore):
             band_units=self.cube_config.band_units,
             processing_kwargs=self.cube_config.processing_kwargs,
         )
-
-        response = self._sentinel_hub.get_data(
-            request, mime_type="application/octet-stream"
-        )
-
-        if response is None or not response.ok:
-            message = (
-                f"{key}: cannot fetch chunk for variable"
-                f" {band_name!r}, bbox {bbox!r}, and"
-                f" time_range {time_range!r}"
-            )
-            if response is not None:
-                message += f": {SentinelHubError(response)}"
-            raise KeyError(message)
-
-        return response.content
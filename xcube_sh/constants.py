@@ -24,6 +24,11 @@ DEFAULT_RETRY_BACKOFF_MAX = 40  # milliseconds
 DEFAULT_RETRY_BACKOFF_BASE = 1.001
 DEFAULT_NUM_RETRIES = 200
 
+# Number of keep-alive connections pooled per SH host. Should cover
+# the number of threads (e.g., dask workers) fetching chunks concurrently,
+# otherwise connections are discarded and new TLS handshakes are needed.
+DEFAULT_HTTP_POOL_SIZE = 32
+
 WGS84_CRS = "WGS84"
 DEFAULT_CRS = WGS84_CRS
 DEFAULT_BAND_UNITS = "DN"
@@ -142,13 +142,7 @@ def gen(
     import json
     import os.path
     import sys
-    import xarray as xr
-    from xcube.core.dsio import write_dataset
-    from xcube.util.perf import measure_time
     from xcube_sh.config import CubeConfig
-    from xcube_sh.observers import Observers
-    from xcube_sh.sentinelhub import SentinelHub
-    from xcube_sh.chunkstore import SentinelHubChunkStore
 
     if request:
         request_dict = _load_request(request)
@@ -201,6 +195,14 @@ def gen(
             f"Output {output_path} " f"already exists. Move it away first."
         )
 
+    # Import only now, so that invalid requests fail fast
+    import xarray as xr
+    from xcube.core.dsio import write_dataset
+    from xcube.util.perf import measure_time
+    from xcube_sh.observers import Observers
+    from xcube_sh.sentinelhub import SentinelHub
+    from xcube_sh.chunkstore import SentinelHubChunkStore
+
     sentinel_hub = SentinelHub(**input_config_dict)
 
     print(f"Writing cube to {output_path}...")
@@ -228,7 +230,7 @@ def gen(
         else:
             write_dataset(cube, output_path, **output_config_dict)
 
-    print(f"Cube written to {output_path}, " f"took {'%.2f' % cm.duration} seconds.")
+    print(f"Cube written to {output_path}, took {cm.duration:.2f} seconds.")
 
     if verbose:
         request_collector.stats.dump()
@@ -384,7 +386,9 @@ def _load_request(request_file: Optional[str]) -> Dict[str, Any]:
             if request_file.endswith(".json"):
                 return json.load(fp)
             else:
-                return yaml.safe_load(fp)
+                # Prefer the libyaml-based loader, if PyYAML has been built with it
+                loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+                return yaml.load(fp, Loader=loader)
     except BaseException as e:
         raise click.ClickException(
             f"Error loading configuration " f"file {request_file}: {e}"
@@ -392,7 +396,9 @@ def _load_request(request_file: Optional[str]) -> Dict[str, Any]:
 
 
 def _overwrite_config_params(config: Dict[str, Any], **config_updates):
-    config.update({k: v for k, v in config_updates.items() if v is not None})
+    for k, v in config_updates.items():
+        if v is not None:
+            config[k] = v
 
 
 def _is_bucket_url(path: str):
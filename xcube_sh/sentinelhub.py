@@ -21,6 +21,7 @@ from .constants import CRS_ID_TO_URI
 from .constants import DEFAULT_CLIENT_ID
 from .constants import DEFAULT_CLIENT_SECRET
 from .constants import DEFAULT_CRS
+from .constants import DEFAULT_HTTP_POOL_SIZE
 from .constants import DEFAULT_MOSAICKING_ORDER
 from .constants import DEFAULT_NUM_RETRIES
 from .constants import DEFAULT_RESAMPLING
@@ -362,7 +363,19 @@ class SentinelHub:
 
         return time_ranges
 
-    def get_data(self, request: Dict, mime_type=None) -> Optional[requests.Response]:
+    def get_data(
+        self, request: Dict, mime_type=None, stream: bool = False
+    ) -> Optional[requests.Response]:
+        """
+        Post a data *request* to the Sentinel Hub Process API.
+
+        :param request: The request, see :meth:`new_data_request`.
+        :param mime_type: The expected response MIME type.
+            If not given, it is derived from the *request*'s outputs.
+        :param stream: Whether to defer downloading the response body
+            until it is accessed, e.g. by ``response.iter_content()``.
+        :return: The response, or None if it could not be obtained.
+        """
         if not mime_type:
             outputs = request["output"]["responses"]
             if len(outputs) > 1:
@@ -383,8 +396,14 @@ class SentinelHub:
         start_time = time.time()
 
         for retry in range(num_retries):
+            if response is not None:
+                # Release the failed attempt's connection back to the pool,
+                # streamed responses are not released until read or closed
+                response.close()
             try:
-                response = self.session.post(process_url, json=request, headers=headers)
+                response = self.session.post(
+                    process_url, json=request, headers=headers, stream=stream
+                )
                 response_error = None
             except oauthlib.oauth2.TokenExpiredError as e:
                 if not last_retry and retry == num_retries - 1:
@@ -702,6 +721,12 @@ class SerializableOAuth2Session(requests_oauthlib.OAuth2Session):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.auth = None
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=DEFAULT_HTTP_POOL_SIZE,
+            pool_maxsize=DEFAULT_HTTP_POOL_SIZE,
+        )
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
 
     def __getstate__(self):
         return {a: getattr(self, a) for a in self._SERIALIZED_ATTRS}